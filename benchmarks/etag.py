@@ -0,0 +1,67 @@
+"""Throughput and peak RSS of utils.get_etag against the previous read() based version.
+
+Each implementation runs in its own process so ru_maxrss is not shared.
+
+Usage: python -m benchmarks.etag [--size MB] [--chunk-size MB]
+"""
+import hashlib
+import os
+import resource
+import time
+from argparse import ArgumentParser
+from multiprocessing import Process
+from multiprocessing import Queue
+from tempfile import TemporaryDirectory
+from s3sync import utils
+
+
+def get_etag_read(filename, chunk_size=utils.CHUNK_SIZE):
+    md5s = []
+    with open(filename, 'rb') as fp:
+        while True:
+            data = fp.read(chunk_size)
+            if not data:
+                break
+            md5s.append(hashlib.md5(data))
+    if len(md5s) == 0:
+        return hashlib.md5(b"").hexdigest()
+    if len(md5s) == 1:
+        return md5s[0].hexdigest()
+    digests = b"".join(m.digest() for m in md5s)
+    md5_hash = hashlib.md5(digests)
+    return '{}-{}'.format(md5_hash.hexdigest(), len(md5s))
+
+
+def run(function, path, chunk_size, results):
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    etag = function(path, chunk_size)
+    elapsed = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((etag, elapsed, peak, peak - rss))
+
+
+def main():
+    parser = ArgumentParser(description='ETag benchmark')
+    parser.add_argument('--size', type=int, default=512, help='File size in MB')
+    parser.add_argument('--chunk-size', dest='chunk_size', type=int, default=8, help='Chunk size in MB')
+    options = parser.parse_args()
+    chunk_size = options.chunk_size * 1024 * 1024
+    with TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, 'data')
+        block = os.urandom(1024 * 1024)
+        with open(path, 'wb') as f:
+            for _ in range(options.size):
+                f.write(block)
+        for name, function in [('read', get_etag_read), ('readinto', utils.get_etag)]:
+            results = Queue()
+            process = Process(target=run, args=(function, path, chunk_size, results))
+            process.start()
+            etag, elapsed, peak, growth = results.get()
+            process.join()
+            print('{:9} {:8.1f} MB/s  peak RSS {:7} KB  (+{} KB)  {}'.format(
+                name, options.size / elapsed, peak, growth, etag))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Hashing throughput of FSEndpoint.update_key_data against --hash-workers.
+
+Usage: python -m benchmarks.hashing [--files N] [--size MB] [--workers 1 2 4 8]
+"""
+import os
+import time
+from argparse import ArgumentParser
+from io import StringIO
+from tempfile import TemporaryDirectory
+from s3sync.fs import FSEndpoint
+
+
+def create_tree(base_path, files, size):
+    block = os.urandom(1024 * 1024)
+    for index in range(files):
+        directory = os.path.join(base_path, 'd{}'.format(index % 16))
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'f{}'.format(index)), 'wb') as f:
+            for _ in range(size):
+                f.write(block)
+
+
+def main():
+    parser = ArgumentParser(description='Hashing benchmark')
+    parser.add_argument('--files', type=int, default=64)
+    parser.add_argument('--size', type=int, default=16, help='File size in MB')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    options = parser.parse_args()
+    with TemporaryDirectory() as base_path:
+        create_tree(base_path, options.files, options.size)
+        total = options.files * options.size
+        for workers in options.workers:
+            endpoint = FSEndpoint(base_path=base_path, includes=[''], cache_file=StringIO(),
+                                  hash_workers=workers)
+            start = time.time()
+            endpoint.update_key_data()
+            elapsed = time.time() - start
+            print('workers: {:3}  {:8.1f} MB/s  {:6.2f} s'.format(workers, total / elapsed, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Directory scan of FSEndpoint.get_path_data against the previous os.walk version.
+
+Reports wall time and the number of stat/scandir calls made by each
+implementation. For raw syscall counts run it under `strace -c -f`.
+
+Usage: python -m benchmarks.scan [--files N] [--files-per-dir N] [--path DIR]
+"""
+import os
+import time
+from argparse import ArgumentParser
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+from s3sync.fs import FSEndpoint
+
+
+def get_path_data_walk(endpoint, include):
+    path_data = dict()
+    path = os.path.join(endpoint.base_path, include)
+    path_list = []
+    if os.path.isfile(path):
+        path_list.append(path)
+    else:
+        for prefix, directories, filenames in os.walk(path):
+            for filename in filenames:
+                file_path = os.path.join(prefix, filename)
+                if os.path.isfile(file_path):
+                    path_list.append(file_path)
+    for path in path_list:
+        stat = os.stat(path)
+        key = path.replace(endpoint.base_path, '', 1).lstrip('/')
+        if not endpoint.is_excluded(key):
+            path_data[key] = dict(
+                size=stat.st_size,
+                last_modified=stat.st_mtime,
+            )
+    return path_data
+
+
+def create_tree(base_path, files, files_per_dir):
+    for index in range(files):
+        directory = os.path.join(base_path, 'd{}'.format(index // files_per_dir // 100),
+                                 'd{}'.format(index // files_per_dir))
+        if index % files_per_dir == 0:
+            os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, 'f{}'.format(index)), 'w').close()
+
+
+def run(name, function, endpoint):
+    start = time.time()
+    path_data = function(endpoint, '')
+    elapsed = time.time() - start
+    # Second pass only counts calls, mocks would skew the timing
+    with patch('os.stat', wraps=os.stat) as stat, patch('os.scandir', wraps=os.scandir) as scandir:
+        function(endpoint, '')
+    # DirEntry.stat() calls are not visible to the mock: one per yielded file
+    stat_calls = stat.call_count if name == 'walk' else stat.call_count + len(path_data)
+    print('{:8} {:8.2f} s  files: {}  stat: {}  scandir: {}'.format(
+        name, elapsed, len(path_data), stat_calls, scandir.call_count))
+
+
+def main():
+    parser = ArgumentParser(description='Scan benchmark')
+    parser.add_argument('--files', type=int, default=1000000)
+    parser.add_argument('--files-per-dir', dest='files_per_dir', type=int, default=1000)
+    parser.add_argument('--path', type=str, help='Scan an existing tree instead of a synthetic one')
+    options = parser.parse_args()
+    with TemporaryDirectory() as base_path:
+        if options.path:
+            base_path = options.path
+        else:
+            create_tree(base_path, options.files, options.files_per_dir)
+        endpoint = FSEndpoint(base_path=base_path, includes=[''], cache_file=StringIO())
+        run('walk', get_path_data_walk, endpoint)
+        run('scandir', FSEndpoint.get_path_data, endpoint)
+
+
+if __name__ == '__main__':
+    main()
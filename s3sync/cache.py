@@ -1,10 +1,63 @@
 import json
 import os
+import sqlite3
+import time
+from contextlib import closing
+from .constants import CACHE_FLUSH_COUNT
+from .constants import CACHE_FLUSH_INTERVAL
+from .constants import DEFAULT_CACHE_BACKEND
 from .constants import DEFAULT_CACHE_DIR
 
 
-class Cache(object):
-    def __init__(self, name='source', cache_dir=None, cache_file=None):
+def get_cache(name='source', cache_dir=None, cache_file=None, backend=DEFAULT_CACHE_BACKEND, **kwargs):
+    if cache_file or backend == 'json':
+        return Cache(name=name, cache_dir=cache_dir, cache_file=cache_file, **kwargs)
+    if backend == 'sqlite':
+        return SQLiteCache(name=name, cache_dir=cache_dir, **kwargs)
+    raise ValueError('Unknown cache backend: {}'.format(backend))
+
+
+class BaseCache(object):
+    def __init__(self, flush_count=CACHE_FLUSH_COUNT, flush_interval=CACHE_FLUSH_INTERVAL):
+        self.flush_count = flush_count
+        self.flush_interval = flush_interval
+        self.flush_time = time.time()
+        # Pending changes: key -> data, None for deleted keys
+        self.changed = dict()
+
+    def set(self, key, data):
+        self.changed[key] = data
+        self.flush_if_needed()
+
+    def remove(self, key):
+        self.changed[key] = None
+        self.flush_if_needed()
+
+    def flush_if_needed(self):
+        if len(self.changed) >= self.flush_count \
+            or time.time() - self.flush_time >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self.changed:
+            changed = self.changed
+            self.changed = dict()
+            self.commit(changed)
+        self.flush_time = time.time()
+
+    def update(self, data):
+        self.commit(data)
+
+    def delete(self, keys):
+        self.commit(dict((key, None) for key in keys))
+
+    def commit(self, changed):
+        raise NotImplementedError()
+
+
+class Cache(BaseCache):
+    def __init__(self, name='source', cache_dir=None, cache_file=None, **kwargs):
+        super().__init__(**kwargs)
         self.cache_file = cache_file
         if not cache_file:
             cache_dir = cache_dir or DEFAULT_CACHE_DIR
@@ -29,6 +82,7 @@ class Cache(object):
             return dict()
 
     def write(self, data):
+        self.changed = dict()
         if self.cache_file:
             cache_file = self.cache_file
             self.write_file(cache_file, data)
@@ -39,4 +93,62 @@ class Cache(object):
     def write_file(self, cache_file, data):
         cache_file.seek(0)
         json.dump(data, cache_file, indent=2)
+        cache_file.truncate()
+
+    def commit(self, changed):
+        # The whole file is rewritten anyway
+        cache_data = self.read()
+        for key, data in changed.items():
+            if data is None:
+                cache_data.pop(key, None)
+            else:
+                cache_data[key] = data
+        self.write(cache_data)
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, name='source', cache_dir=None, **kwargs):
+        super().__init__(**kwargs)
+        cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.cache_file_name = os.path.join(cache_dir, '.s3sync-{}.sqlite'.format(name))
+        # Existing json cache is imported when the sqlite file does not exist yet
+        self.json_cache = Cache(name=name, cache_dir=cache_dir)
+
+    def connect(self):
+        exists = os.path.exists(self.cache_file_name)
+        connection = sqlite3.connect(self.cache_file_name)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS key_data '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID'
+            )
+            if not exists:
+                self.insert(connection, self.json_cache.read())
+        return connection
+
+    def insert(self, connection, data):
+        connection.executemany(
+            'INSERT OR REPLACE INTO key_data (key, value) VALUES (?, ?)',
+            ((key, json.dumps(value, separators=(',', ':'))) for key, value in data.items()),
+        )
+
+    def read(self):
+        with closing(self.connect()) as connection:
+            rows = connection.execute('SELECT key, value FROM key_data')
+            return dict((key, json.loads(value)) for key, value in rows)
+
+    def write(self, data):
+        self.changed = dict()
+        with closing(self.connect()) as connection, connection:
+            connection.execute('DELETE FROM key_data')
+            self.insert(connection, data)
 
+    def commit(self, changed):
+        # Single transaction: a restart sees either all the changes or none
+        updated = dict((key, data) for key, data in changed.items() if data is not None)
+        deleted = [(key,) for key, data in changed.items() if data is None]
+        with closing(self.connect()) as connection, connection:
+            self.insert(connection, updated)
+            connection.executemany('DELETE FROM key_data WHERE key = ?', deleted)
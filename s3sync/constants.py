@@ -2,4 +2,9 @@ import pathlib
 
 DEFAULT_SOURCE = pathlib.Path.home().as_posix()
 DEFAULT_CACHE_DIR = pathlib.Path.home().as_posix()
+DEFAULT_CACHE_BACKEND = 'sqlite'
+CACHE_BACKENDS = ['json', 'sqlite']
+CACHE_FLUSH_COUNT = 1000
+CACHE_FLUSH_INTERVAL = 60
 HASHED_BYTES_THRESHOLD = 1024 * 1024 * 100
+DELETE_BATCH_SIZE = 1000
@@ -4,13 +4,15 @@ from .logger import Logger
 
 
 class BaseEndpoint(Logger):
-    def __init__(self, name='', includes=[], excludes=[], log_prefix='', verbosity=0):
+    def __init__(self, name='', includes=[], excludes=[], workers=1, log_prefix='', verbosity=0):
         super().__init__(log_prefix=log_prefix, verbosity=verbosity)
         self.name = name
         self.includes = includes
         self.excludes = excludes
+        self.workers = max(workers, 1)
         self.key_data = dict()
         self.etag = dict()
+        self.delete_batch_size = 1
         self.counter = FileByteCounter(name, verbosity=verbosity)
 
     def is_excluded(self, key):
@@ -32,18 +34,48 @@ class BaseEndpoint(Logger):
     def update_single_key_data(self, key):
         pass
 
+    def update_keys_data(self, keys):
+        for key in keys:
+            self.update_single_key_data(key)
+
+    def set_single_key_data(self, key, data):
+        # data is None when the key does not exist anymore
+        old_data = self.key_data.get(key, None)
+        include = self.get_include(key)
+        if data:
+            self.key_data[key] = data
+            self.etag[key] = data['etag']
+            if old_data:
+                self.counter.add(0, data['size'] - old_data['size'], include)
+            else:
+                self.counter.add(1, data['size'], include)
+        else:
+            if old_data:
+                self.counter.add(-1, -old_data['size'], include)
+                del self.key_data[key]
+            if key in self.etag: del self.etag[key]
+
     def update_etag(self):
         self.etag = dict((key, data['etag']) for key, data in self.key_data.items())
 
     def transfer(self, key, destination):
         raise NotImplementedError()
 
-    def delete(self, key):
+    def delete(self, key, fake=False):
         raise NotImplementedError()
 
+    def delete_keys(self, keys, fake=False):
+        # Returns a dict of key: error message for keys not deleted
+        for key in keys:
+            self.delete(key, fake=fake)
+        return dict()
+
     def write_cache(self):
         pass
 
+    def flush_cache(self):
+        pass
+
     def observer_start(self, events_queue):
         pass
 
@@ -1,54 +1,102 @@
 import json
 import os
 import shutil
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from operator import itemgetter
 from shutil import copy2
 from watchdog.events import FileSystemEventHandler
 from watchdog.observers import Observer
 from . import utils
-from .cache import Cache
+from .cache import get_cache
+from .constants import DEFAULT_CACHE_BACKEND
 from .constants import HASHED_BYTES_THRESHOLD
 from .endpoint import BaseEndpoint
 
 
 class FSEndpoint(BaseEndpoint, FileSystemEventHandler):
     def __init__(self, name='source', base_path='/', cache_dir=None, cache_file=None,
-                 hashed_bytes_threshold=HASHED_BYTES_THRESHOLD, **kwargs):
+                 cache_backend=DEFAULT_CACHE_BACKEND, hashed_bytes_threshold=HASHED_BYTES_THRESHOLD,
+                 hash_workers=1, scan_workers=1, **kwargs):
         super().__init__(name=name, log_prefix=name, **kwargs)
         self.type = 'fs'
         self.name = name
         self.base_path = base_path
         self.hashed_bytes_threshold = hashed_bytes_threshold
-        self.cache = Cache(name=name, cache_dir=cache_dir, cache_file=cache_file)
+        self.hash_workers = max(hash_workers, 1)
+        self.scan_workers = max(scan_workers, 1)
+        self.cache = get_cache(name=name, cache_dir=cache_dir, cache_file=cache_file, backend=cache_backend)
         self.key_data = self.cache.read()
 
-    def get_path_data(self, include):
-        path_data = dict()
+    def get_key(self, path):
+        return path.replace(self.base_path, '', 1).lstrip('/')
+
+    def scan_path(self, include, recursive=True):
+        # Yields (key, stat) of files in include, excluded directories are not entered
         path = os.path.join(self.base_path, include)
-        path_list = []
         if os.path.isfile(path):
-            path_list.append(path)
-        else:
-            for prefix, directories, filenames in os.walk(path):
-                for filename in filenames:
-                    file_path = os.path.join(prefix, filename)
-                    if os.path.isfile(file_path):
-                        path_list.append(file_path)
-        for path in path_list:
-            stat = os.stat(path)
-            key = path.replace(self.base_path, '', 1).lstrip('/')
+            key = self.get_key(path)
             if not self.is_excluded(key):
-                path_data[key] = dict(
-                    size=stat.st_size,
-                    last_modified=stat.st_mtime,
-                )
+                yield key, os.stat(path)
+            return
+        directories = [path]
+        while directories:
+            try:
+                entries = os.scandir(directories.pop())
+            except OSError:
+                # Same as os.walk: unreadable or vanished directories are skipped
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive and not self.is_excluded(self.get_key(entry.path)):
+                            directories.append(entry.path)
+                    elif entry.is_file():
+                        key = self.get_key(entry.path)
+                        if not self.is_excluded(key):
+                            try:
+                                yield key, entry.stat()
+                            except FileNotFoundError:
+                                pass
+
+    def get_path_data(self, include, recursive=True):
+        path_data = dict()
+        for key, stat in self.scan_path(include, recursive=recursive):
+            path_data[key] = dict(
+                size=stat.st_size,
+                last_modified=stat.st_mtime,
+            )
         return path_data
 
+    def get_scan_tasks(self):
+        # (include, recursive) list: with more than one worker each include
+        # is split in its own files plus one task per subdirectory
+        tasks = []
+        for include in self.includes:
+            path = os.path.join(self.base_path, include)
+            if self.scan_workers == 1 or not os.path.isdir(path):
+                tasks.append((include, True))
+                continue
+            tasks.append((include, False))
+            try:
+                with os.scandir(path) as entries:
+                    directories = sorted(e.path for e in entries if e.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+            for directory in directories:
+                key = self.get_key(directory)
+                if not self.is_excluded(key):
+                    tasks.append((key, True))
+        return tasks
+
     def get_fs_key_data(self):
         key_data = dict()
-        for include in self.includes:
-            key_data.update(self.get_path_data(include))
+        with ThreadPoolExecutor(max_workers=self.scan_workers) as executor:
+            futures = [executor.submit(self.get_path_data, *task) for task in self.get_scan_tasks()]
+            # Merged in task order whatever the completion order is
+            for future in futures:
+                key_data.update(future.result())
         return key_data
 
     def update_key_data(self):
@@ -56,69 +104,68 @@ class FSEndpoint(BaseEndpoint, FileSystemEventHandler):
         hashed_bytes = 0
         hashed_files = 0
         total_files = len(fs_data)
-        key_errors = []
-        include_files = dict()
-        include_bytes = dict()
+        changed_keys = []
         for key, data in fs_data.items():
-            hashed_files += 1
             old_data = self.key_data.get(key, dict())
             if      data['size'] == old_data.get('size') \
                 and data['last_modified'] == old_data.get('last_modified') \
                 and 'etag' in old_data:
                 data['etag'] = old_data.get('etag')
+                hashed_files += 1
             else:
-                path = os.path.join(self.base_path, key)
-                try:
-                    data['etag'] = utils.get_etag(path)
-                except Exception as e:
-                    key_errors.append(key)
-                    self.log_error('File: {}'.format(path), error=e)
+                changed_keys.append(key)
+        with ThreadPoolExecutor(max_workers=self.hash_workers) as executor:
+            for key, etag in self.get_etags(executor, changed_keys):
+                hashed_files += 1
+                if etag is None:
+                    del fs_data[key]
                     continue
-                hashed_bytes += data['size']
+                fs_data[key]['etag'] = etag
+                hashed_bytes += fs_data[key]['size']
                 if hashed_bytes > self.hashed_bytes_threshold:
                     self.cache.write(fs_data)
                     hashed_bytes = 0
                     self.log_info('Hashed files: {}/{}'.format(hashed_files, total_files))
-            if key not in key_errors:
-                include = self.get_include(key)
-                include_files[include] = include_files.get(include, 0) + 1
-                include_bytes[include] = include_bytes.get(include, 0) + data['size']
-        for key in key_errors:
-            del fs_data[key]
+        include_files = dict()
+        include_bytes = dict()
+        for key, data in fs_data.items():
+            include = self.get_include(key)
+            include_files[include] = include_files.get(include, 0) + 1
+            include_bytes[include] = include_bytes.get(include, 0) + data['size']
         self.key_data = fs_data
-        self.write_cache()
+        self.cache.write(self.key_data)
         self.update_etag()
         for include in include_files.keys():
             self.counter.set(include_files[include], include_bytes[include], include)
         self.counter.log_totals()
 
     def write_cache(self):
-        self.cache.write(self.key_data)
+        # Full scans write the whole cache, here only pending changes are left
+        self.cache.flush()
+
+    def flush_cache(self):
+        self.cache.flush_if_needed()
+
+    def set_single_key_data(self, key, data):
+        super().set_single_key_data(key, data)
+        if data:
+            self.cache.set(key, data)
+        else:
+            self.cache.remove(key)
 
     def update_single_key_data(self, key):
         if not self.is_excluded(key):
             path = self.get_path(key)
             try:
                 stat = os.stat(path)
-                etag = utils.get_etag(path)
-                old_data = self.key_data.get(key, None)
-                self.key_data[key] = dict(
+                data = dict(
                     size=stat.st_size,
                     last_modified=stat.st_mtime,
-                    etag=etag,
+                    etag=utils.get_etag(path),
                 )
-                self.etag[key] = etag
-                include = self.get_include(key)
-                if old_data:
-                    self.counter.add(0, self.key_data[key]['size'] - old_data['size'], include)
-                else:
-                    self.counter.add(1, self.key_data[key]['size'], include)
             except FileNotFoundError:
-                if key in self.key_data:
-                    include = self.get_include(key)
-                    self.counter.add(-1, -self.key_data[key]['size'], include)
-                    del self.key_data[key]
-                if key in self.etag: del self.etag[key]
+                data = None
+            self.set_single_key_data(key, data)
 
     def get_path(self, key):
         return os.path.join(self.base_path, key)
@@ -2,6 +2,8 @@ from argparse import ArgumentParser
 from prometheus_client import start_http_server
 from .constants import DEFAULT_SOURCE
 from .constants import DEFAULT_CACHE_DIR
+from .constants import DEFAULT_CACHE_BACKEND
+from .constants import CACHE_BACKENDS
 from .sync import SyncManager
 
 
@@ -14,6 +16,9 @@ def main(args):
     parser.add_argument('--cache-dir', dest='cache_dir', type=str,
         default=DEFAULT_CACHE_DIR, metavar='DIR',
         help='Cache directory, default: {}'.format(DEFAULT_CACHE_DIR))
+    parser.add_argument('--cache-backend', dest='cache_backend', type=str,
+        default=DEFAULT_CACHE_BACKEND, choices=CACHE_BACKENDS,
+        help='Cache backend, default: {}'.format(DEFAULT_CACHE_BACKEND))
     parser.add_argument('--include', dest='includes', type=str, nargs='+', metavar='PATH',
         default=[''], help='Paths to include, if not specified it will sync everything in source path')
     parser.add_argument('--exclude', dest='excludes', type=str, nargs='*',
@@ -26,6 +31,12 @@ def main(args):
         '--rescan-delay', dest='rescan_delay', type=int, default=0, metavar='SECONDS',
         help='Delay for complete rescan: 0 = no rescan',
     )
+    parser.add_argument('--workers', dest='workers', type=int, default=1, metavar='N',
+        help='Number of concurrent transfers, default: 1')
+    parser.add_argument('--hash-workers', dest='hash_workers', type=int, default=1, metavar='N',
+        help='Number of files hashed concurrently, default: 1')
+    parser.add_argument('--scan-workers', dest='scan_workers', type=int, default=1, metavar='N',
+        help='Number of directories scanned concurrently, default: 1')
     parser.add_argument('--port', type=int, help='Prometheus port')
     parser.add_argument('-v', '--verbosity', dest='verbosity', type=int,
         default=1, help='Verbosity level', metavar='N')
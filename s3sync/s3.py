@@ -1,8 +1,10 @@
 import os
 import boto3
 import botocore
+from concurrent.futures import ThreadPoolExecutor
 from .import exceptions
 from . import utils
+from .constants import DELETE_BATCH_SIZE
 from .endpoint import BaseEndpoint
 
 
@@ -12,6 +14,7 @@ class S3Endpoint(BaseEndpoint):
         super().__init__(log_prefix=self.profile_name, **kwargs)
         self.type = 's3'
         self.bucket = None
+        self.delete_batch_size = DELETE_BATCH_SIZE
 
     def get_profile(self, env_first=False):
         env = dict()
@@ -72,29 +75,27 @@ class S3Endpoint(BaseEndpoint):
         self.update_etag()
         self.counter.log_totals()
 
-    def update_single_key_data(self, key):
-        bucket = self.get_bucket()
+    def get_single_key_data(self, key):
+        client = self.get_bucket().meta.client
         try:
-            base_path = self.base_path.rstrip('/')
-            data = bucket.Object('{}/{}'.format(base_path, key)).get()
-            etag = data['ETag'].strip('"')
-            old_data = self.key_data.get(key, None)
-            self.key_data[key] = dict(
-                size=data['ContentLength'],
-                etag=etag,
-            )
-            self.etag[key] = etag
-            include = self.get_include(key)
-            if old_data:
-                self.counter.add(0, self.key_data[key]['size'] - old_data['size'], include)
-            else:
-                self.counter.add(1, self.key_data[key]['size'], include)
-        except bucket.meta.client.exceptions.NoSuchKey:
-            if key in self.key_data:
-                include = self.get_include(key)
-                self.counter.add(-1, -self.key_data[key]['size'], include)
-                del self.key_data[key]
-            if key in self.etag: del self.etag[key]
+            data = client.head_object(Bucket=self.bucket_name, Key=self.get_path(key))
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+        return dict(
+            size=data['ContentLength'],
+            etag=data['ETag'].strip('"'),
+        )
+
+    def update_single_key_data(self, key):
+        self.set_single_key_data(key, self.get_single_key_data(key))
+
+    def update_keys_data(self, keys):
+        # HEAD requests run concurrently, key_data and counters are updated here
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for key, data in zip(keys, executor.map(self.get_single_key_data, keys)):
+                self.set_single_key_data(key, data)
 
     def get_path(self, key):
         return os.path.join(self.base_path, key)
@@ -118,3 +119,20 @@ class S3Endpoint(BaseEndpoint):
             destination = '{}/{}'.format(self.base_path, key)
             self.get_bucket().Object(destination).delete()
         self.log_info(key, log_prefix='delete')
+
+    def delete_keys(self, keys, fake=False):
+        errors = dict()
+        if not fake:
+            client = self.get_bucket().meta.client
+            objects = [dict(Key=self.get_path(key)) for key in keys]
+            response = client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete=dict(Objects=objects, Quiet=True),
+            )
+            for error in response.get('Errors', []):
+                key = self.get_key(error['Key'])
+                errors[key] = '{} - {}'.format(error.get('Code'), error.get('Message'))
+        for key in keys:
+            if key not in errors:
+                self.log_info(key, log_prefix='delete')
+        return errors
@@ -1,11 +1,15 @@
 import time
 import botocore
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from datetime import datetime
 from datetime import timedelta
 from queue import Queue
 from .import exceptions
 from .import metrics
 from .import utils
+from .constants import DEFAULT_CACHE_BACKEND
 from .counter import FileByteCounter
 from .fs import FSEndpoint
 from .logger import Logger
@@ -13,9 +17,10 @@ from .s3 import S3Endpoint
 
 
 class SyncManager(Logger):
-    def __init__(self, fake=False, verbosity=0, **kwargs):
+    def __init__(self, fake=False, verbosity=0, workers=1, **kwargs):
         super().__init__(log_prefix='SyncManager', verbosity=verbosity)
         self.fake = fake
+        self.workers = max(workers, 1)
         restore = kwargs.get('restore', False)
         source = kwargs['destination'] if restore else kwargs['source']
         destination = kwargs['source'] if restore else kwargs['destination']
@@ -33,11 +38,15 @@ class SyncManager(Logger):
         keys = ['includes', 'excludes', 'verbosity']
         options = {k: kwargs[k] for k in keys if k in kwargs}
         options['verbosity'] = self.verbosity
+        options['workers'] = self.workers
         options['name'] = name
         if path.startswith('/'):
             options['base_path'] = path
             options['cache_dir'] = kwargs.get('cache_dir')
             options['cache_file'] = kwargs.get('cache_file')
+            options['cache_backend'] = kwargs.get('cache_backend', DEFAULT_CACHE_BACKEND)
+            options['hash_workers'] = kwargs.get('hash_workers', 1)
+            options['scan_workers'] = kwargs.get('scan_workers', 1)
             return FSEndpoint(**options)
         else:
             options['base_url'] = path
@@ -95,6 +104,10 @@ class SyncManager(Logger):
         # Update queue counter
         include_files = dict()
         include_bytes = dict()
+        for key in operations['delete']:
+            include = self.source.get_include(key)
+            include_files[include] = include_files.get(include, 0) + 1
+            include_bytes[include] = include_bytes.get(include, 0)
         for key in operations['transfer']:
             include = self.source.get_include(key)
             include_files[include] = include_files.get(include, 0) + 1
@@ -115,24 +128,81 @@ class SyncManager(Logger):
                 time.sleep(5)
 
     def execute_operations(self):
-        #  Operations
-        while len(self.operations['delete']) > 0:
-            key = self.operations['delete'][0]
-            self.destination.delete(key, fake=self.fake)
-            self.operations['delete'].pop(0)
-            include = self.source.get_include(key)
+        # Deletes are completed before any transfer is started
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            self.execute_queue(executor, 'delete', self.execute_delete,
+                               batch_size=self.destination.delete_batch_size)
+            self.execute_queue(executor, 'transfer', self.execute_transfer)
+
+    def execute_queue(self, executor, operation, function, batch_size=1):
+        keys = self.operations[operation]
+        position = 0
+        running = dict()
+        running_keys = set()
+        done = set()
+        error = None
+        while running or (error is None and position < len(keys)):
+            # Keep at most two batches per worker in flight, never the same key twice
+            while error is None and position < len(keys) and len(running) < self.workers * 2:
+                batch = []
+                while position < len(keys) and len(batch) < batch_size:
+                    if keys[position] in running_keys or keys[position] in batch:
+                        break
+                    batch.append(keys[position])
+                    position += 1
+                if not batch:
+                    break
+                running[executor.submit(function, batch)] = batch
+                running_keys.update(batch)
+            completed, _ = wait(running, return_when=FIRST_COMPLETED)
+            refresh = []
+            for future in completed:
+                batch = running.pop(future)
+                running_keys.difference_update(batch)
+                try:
+                    errors = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                for key in batch:
+                    done.add(key)
+                    refresh.append(key)
+                    if key in errors:
+                        self.operation_failed(operation, key, errors[key])
+                    else:
+                        self.operation_done(operation, key)
+            self.destination.update_keys_data(refresh)
+        self.operations[operation] = [k for k in keys if k not in done]
+        if error:
+            raise error
+
+    def execute_delete(self, keys):
+        return self.destination.delete_keys(keys, fake=self.fake)
+
+    def execute_transfer(self, keys):
+        for key in keys:
+            self.transfer(key, fake=self.fake)
+        return dict()
+
+    def operation_done(self, operation, key):
+        # Counters are updated from the calling thread only
+        include = self.source.get_include(key)
+        if operation == 'delete':
             self.queue_counter.add(-1, 0, include)
             self.transferred_counter.add(1, 0, include)
-            self.destination.update_single_key_data(key)
-        while len(self.operations['transfer']) > 0:
-            key = self.operations['transfer'][0]
-            self.transfer(key, fake=self.fake)
-            self.operations['transfer'].pop(0)
+        else:
             size = self.source.key_data[key]['size']
-            include = self.source.get_include(key)
             self.queue_counter.add(-1, -size, include)
             self.transferred_counter.add(1, size, include)
-            self.destination.update_single_key_data(key)
+
+    def operation_failed(self, operation, key, message):
+        # Key is dropped from the queue, next rescan will pick it up again
+        self.log_error('{} - {}'.format(key, message), error_type=operation, log_prefix=operation)
+        include = self.source.get_include(key)
+        if operation == 'delete':
+            self.queue_counter.add(-1, 0, include)
+        else:
+            self.queue_counter.add(-1, -self.source.key_data[key]['size'], include)
 
     def get_events_operations(self):
         transfer = []
@@ -192,6 +262,10 @@ class SyncManager(Logger):
                     self.sync_operations(operations)
                 except exceptions.SourceVanishedError:
                     self.sync(rescan=True)
+                self.source.flush_cache()
+                self.destination.flush_cache()
         except KeyboardInterrupt:
             pass
         self.source.observer_stop()
+        self.source.write_cache()
+        self.destination.write_cache()
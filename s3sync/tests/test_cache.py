@@ -2,7 +2,11 @@ import os
 from io import StringIO
 from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import ANY
+from unittest.mock import patch
 from ..cache import Cache
+from ..cache import SQLiteCache
+from ..cache import get_cache
 
 
 class CacheTest(TestCase):
@@ -42,3 +46,114 @@ class CacheTest(TestCase):
         cache.write(dict(name='Bob'))
         content = cache_file.getvalue()
         self.assertIn('"name": "Bob"', content)
+
+    def test_update_file(self):
+        cache_file = StringIO('{"f1": {"size": 1}, "f2": {"size": 2}}')
+        cache = Cache(name='source', cache_file=cache_file)
+        cache.update(dict(f1=dict(size=3)))
+        cache.delete(['f2'])
+        self.assertEqual(cache.read(), dict(f1=dict(size=3)))
+
+
+class SQLiteCacheTest(TestCase):
+    def test_read_not_found(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = SQLiteCache(name='source', cache_dir=cache_dir)
+            self.assertEqual(cache.read(), dict())
+            self.assertTrue(os.path.isfile(os.path.join(cache_dir, '.s3sync-source.sqlite')))
+
+    def test_write_read(self):
+        data = {
+            'files/f1': dict(size=8, etag='hash', last_modified=1527577755.3356848),
+            'files/f2': dict(size=0, etag='d41d8cd98f00b204e9800998ecf8427e', last_modified=1.5),
+        }
+        with TemporaryDirectory() as cache_dir:
+            SQLiteCache(name='source', cache_dir=cache_dir).write(data)
+            self.assertEqual(SQLiteCache(name='source', cache_dir=cache_dir).read(), data)
+            # write replaces everything
+            SQLiteCache(name='source', cache_dir=cache_dir).write(dict(f3=dict(size=3)))
+            self.assertEqual(SQLiteCache(name='source', cache_dir=cache_dir).read(), dict(f3=dict(size=3)))
+
+    def test_update_delete(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = SQLiteCache(name='source', cache_dir=cache_dir)
+            cache.write(dict(f1=dict(size=1), f2=dict(size=2)))
+            cache.update(dict(f1=dict(size=10), f3=dict(size=3)))
+            cache.delete(['f2', 'f4'])
+            self.assertEqual(cache.read(), dict(f1=dict(size=10), f3=dict(size=3)))
+
+    def test_migrate_json(self):
+        with TemporaryDirectory() as cache_dir:
+            file_name = os.path.join(cache_dir, '.s3sync-source.json')
+            with open(file_name, 'w') as cache_file:
+                cache_file.write('{"f1": {"size": 1, "etag": "hash"}}')
+            cache = SQLiteCache(name='source', cache_dir=cache_dir)
+            self.assertEqual(cache.read(), dict(f1=dict(size=1, etag='hash')))
+            # json file is imported only once
+            with open(file_name, 'w') as cache_file:
+                cache_file.write('{"f2": {"size": 2, "etag": "hash"}}')
+            self.assertEqual(cache.read(), dict(f1=dict(size=1, etag='hash')))
+
+
+class GetCacheTest(TestCase):
+    def test_cache_file(self):
+        cache = get_cache(cache_file=StringIO(), backend='sqlite')
+        self.assertIsInstance(cache, Cache)
+
+    def test_json(self):
+        cache = get_cache(backend='json')
+        self.assertIsInstance(cache, Cache)
+
+    def test_sqlite(self):
+        cache = get_cache(backend='sqlite')
+        self.assertIsInstance(cache, SQLiteCache)
+
+    def test_unknown(self):
+        with self.assertRaises(ValueError):
+            get_cache(backend='unknown')
+
+
+class CacheFlushTest(TestCase):
+    def test_flush(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = SQLiteCache(name='source', cache_dir=cache_dir)
+            cache.write(dict(f1=dict(size=1), f2=dict(size=2)))
+            cache.set('f3', dict(size=3))
+            cache.remove('f1')
+            self.assertEqual(cache.read(), dict(f1=dict(size=1), f2=dict(size=2)))
+            cache.flush()
+            self.assertEqual(cache.changed, dict())
+            self.assertEqual(cache.read(), dict(f2=dict(size=2), f3=dict(size=3)))
+
+    def test_flush_count(self):
+        cache = Cache(name='source', cache_file=StringIO(), flush_count=2)
+        cache.set('f1', dict(size=1))
+        self.assertEqual(cache.read(), dict())
+        cache.set('f2', dict(size=2))
+        self.assertEqual(cache.read(), dict(f1=dict(size=1), f2=dict(size=2)))
+        self.assertEqual(cache.changed, dict())
+
+    def test_flush_interval(self):
+        cache = Cache(name='source', cache_file=StringIO(), flush_interval=0)
+        cache.set('f1', dict(size=1))
+        self.assertEqual(cache.read(), dict(f1=dict(size=1)))
+
+    def test_flush_only_changes(self):
+        with TemporaryDirectory() as cache_dir:
+            cache = SQLiteCache(name='source', cache_dir=cache_dir)
+            cache.write(dict(('f{}'.format(i), dict(size=i)) for i in range(100)))
+            cache.set('f1', dict(size=10))
+            cache.remove('f2')
+            with patch.object(cache, 'insert', wraps=cache.insert) as insert:
+                cache.flush()
+            insert.assert_called_once_with(ANY, dict(f1=dict(size=10)))
+            data = cache.read()
+            self.assertEqual(len(data), 99)
+            self.assertEqual(data['f1'], dict(size=10))
+
+    def test_write_discards_changes(self):
+        cache = Cache(name='source', cache_file=StringIO())
+        cache.set('f1', dict(size=1))
+        cache.write(dict(f2=dict(size=2)))
+        cache.flush()
+        self.assertEqual(cache.read(), dict(f2=dict(size=2)))
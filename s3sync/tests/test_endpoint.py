@@ -26,6 +26,22 @@ class BaseEndpointTest(TestCase):
         endpoint = BaseEndpoint()
         endpoint.update_single_key_data('f1')
 
+    def test_update_keys_data(self):
+        endpoint = BaseEndpoint()
+        endpoint.update_keys_data(['f1', 'f2'])
+
+    def test_set_single_key_data(self):
+        endpoint = BaseEndpoint(includes=[''])
+        endpoint.set_single_key_data('f1', dict(size=1, etag='etag1'))
+        endpoint.set_single_key_data('f2', dict(size=2, etag='etag2'))
+        endpoint.set_single_key_data('f1', dict(size=3, etag='etag3'))
+        endpoint.set_single_key_data('f2', None)
+        endpoint.set_single_key_data('f4', None)
+        self.assertEqual(endpoint.key_data, dict(f1=dict(size=3, etag='etag3')))
+        self.assertEqual(endpoint.etag, dict(f1='etag3'))
+        self.assertEqual(endpoint.counter.total_files, 1)
+        self.assertEqual(endpoint.counter.total_bytes, 3)
+
     def test_update_etag(self):
         endpoint = BaseEndpoint()
         self.assertEqual(endpoint.etag, dict())
@@ -71,6 +87,11 @@ class BaseEndpointTest(TestCase):
         with self.assertRaises(NotImplementedError):
             endpoint.delete('f1')
 
+    def test_delete_keys(self):
+        endpoint = BaseEndpoint()
+        with self.assertRaises(NotImplementedError):
+            endpoint.delete_keys(['f1'])
+
     def test_observer_start(self):
         endpoint = BaseEndpoint()
         endpoint.observer_start(None)
@@ -169,6 +169,65 @@ class FSEndpointGetFsKeyTest(TestCase):
         )
 
 
+    def test_excluded_directory_not_scanned(self):
+        includes = [
+            os.path.join('files'),
+        ]
+        excludes = [
+            os.path.join('files', 'd2'),
+        ]
+        endpoint = FSEndpoint(base_path=self.base_path, includes=includes, excludes=excludes, cache_file=StringIO())
+        with patch('os.scandir', wraps=os.scandir) as scandir:
+            key_data = endpoint.get_fs_key_data()
+        self.assertEqual(sorted(key_data.keys()), ['files/d1/f1', 'files/d1/f2', 'files/f1'])
+        scanned = sorted(os.path.relpath(call[0][0], self.base_path) for call in scandir.call_args_list)
+        self.assertEqual(scanned, ['files', os.path.join('files', 'd1')])
+
+    def test_scan_path(self):
+        endpoint = FSEndpoint(base_path=self.base_path, includes=['files'], cache_file=StringIO())
+        entries = endpoint.scan_path('files')
+        self.assertNotIsInstance(entries, (list, dict))
+        self.assertEqual(len(dict(entries)), 5)
+        self.assertEqual(list(endpoint.scan_path('missing')), [])
+
+    def test_symlinks(self):
+        with TemporaryDirectory() as base_path, TemporaryDirectory() as other_dir:
+            with open(os.path.join(other_dir, 'f1'), 'w') as f:
+                f.write('content')
+            os.symlink(other_dir, os.path.join(base_path, 'linked_dir'))
+            os.symlink(os.path.join(other_dir, 'f1'), os.path.join(base_path, 'linked_file'))
+            endpoint = FSEndpoint(base_path=base_path, includes=[''], cache_file=StringIO())
+            key_data = endpoint.get_fs_key_data()
+        self.assertEqual(list(key_data.keys()), ['linked_file'])
+        self.assertEqual(key_data['linked_file']['size'], 7)
+
+
+    def test_scan_workers(self):
+        includes = [
+            os.path.join('files'),
+            os.path.join('files', 'd1'),
+            os.path.join('etags', 'f1'),
+        ]
+        excludes = [
+            os.path.join('files', 'd2'),
+        ]
+        serial = FSEndpoint(base_path=self.base_path, includes=includes, excludes=excludes, cache_file=StringIO())
+        endpoint = FSEndpoint(base_path=self.base_path, includes=includes, excludes=excludes, cache_file=StringIO(),
+                              scan_workers=4)
+        self.assertEqual(
+            endpoint.get_scan_tasks(),
+            [
+                ('files', False),
+                (os.path.join('files', 'd1'), True),
+                (os.path.join('files', 'd1'), False),
+                (os.path.join('etags', 'f1'), True),
+            ],
+        )
+        key_data = endpoint.get_fs_key_data()
+        self.assertEqual(key_data, serial.get_fs_key_data())
+        self.assertEqual(sorted(key_data.keys()), ['etags/f1', 'files/d1/f1', 'files/d1/f2', 'files/f1'])
+
+
 class FSEndpointReadCacheTest(TestCase):
     def test_empty_1(self):
         cache_file = StringIO()
@@ -274,6 +333,32 @@ class FSEndpointUpdateKeyDataTest(TestCase):
         endpoint = FSEndpoint(base_path=base_path, includes=includes, cache_file=StringIO(), hashed_bytes_threshold=20)
         endpoint.update_key_data()
 
+    def test_hash_workers(self):
+        includes = [
+            os.path.join('files'),
+        ]
+        serial = FSEndpoint(base_path=self.base_path, includes=includes, cache_file=StringIO())
+        serial.update_key_data()
+        endpoint = FSEndpoint(base_path=self.base_path, includes=includes, cache_file=StringIO(), hash_workers=4)
+        endpoint.update_key_data()
+        self.assertEqual(endpoint.key_data, serial.key_data)
+        self.assertEqual(endpoint.etag, serial.etag)
+        self.assertEqual(endpoint.counter.files, serial.counter.files)
+        self.assertEqual(endpoint.counter.bytes, serial.counter.bytes)
+        self.assertEqual(endpoint.counter.total_files, 5)
+        self.assertEqual(endpoint.counter.total_bytes, 64)
+
+    def test_hash_workers_checkpoint(self):
+        includes = [
+            os.path.join('files'),
+        ]
+        endpoint = FSEndpoint(base_path=self.base_path, includes=includes, cache_file=StringIO(),
+                              hashed_bytes_threshold=20, hash_workers=4)
+        with patch.object(endpoint.cache, 'write', wraps=endpoint.cache.write) as write:
+            endpoint.update_key_data()
+        # 64 bytes hashed: two checkpoints and the final write
+        self.assertEqual(write.call_count, 3)
+
     def test_cache(self):
         base_path = self.base_path
         includes = [
@@ -434,6 +519,31 @@ class FSEndpointUpdateSingleKeyDataTest(TestCase):
             self.assertEqual(endpoint.counter.total_bytes, 0)
 
 
+class FSEndpointIncrementalCacheTest(TestCase):
+    def test_update_single_key_data(self):
+        with TemporaryDirectory() as backup_dir, TemporaryDirectory() as cache_dir:
+            endpoint = FSEndpoint(base_path=backup_dir, includes=[''], cache_dir=cache_dir)
+            for name in ['f1', 'f2', 'f3']:
+                with open(endpoint.get_path(name), 'w') as f:
+                    f.write('content')
+            endpoint.update_key_data()
+            # Change f1, delete f2
+            with open(endpoint.get_path('f1'), 'w') as f:
+                f.write('contentcontent')
+            os.remove(endpoint.get_path('f2'))
+            endpoint.update_single_key_data('f1')
+            endpoint.update_single_key_data('f2')
+            self.assertEqual(sorted(endpoint.cache.changed.keys()), ['f1', 'f2'])
+            with patch.object(endpoint.cache, 'write') as write:
+                endpoint.write_cache()
+            write.assert_not_called()
+            self.assertEqual(endpoint.cache.changed, dict())
+            # A new endpoint sees the changes
+            endpoint = FSEndpoint(base_path=backup_dir, includes=[''], cache_dir=cache_dir)
+            self.assertEqual(sorted(endpoint.key_data.keys()), ['f1', 'f3'])
+            self.assertEqual(endpoint.key_data['f1']['etag'], '6858851eee0e05f318897984757b59dc')
+
+
 class FSEndpointGetDestinationPathTest(TestCase):
     def test_ok(self):
         with TemporaryDirectory() as backup_dir:
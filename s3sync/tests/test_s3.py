@@ -5,6 +5,7 @@ from contextlib import redirect_stdout
 from tempfile import TemporaryDirectory
 from test.support import EnvironmentVarGuard
 from unittest import TestCase
+from unittest.mock import patch
 from moto import mock_s3
 from .. import exceptions
 from .. import utils
@@ -257,6 +258,54 @@ class S3EndpointUpdateSingleKeyDataTest(TestCase):
         self.assertEqual(endpoint.counter.total_bytes, 0)
 
 
+    @mock_s3
+    def test_head(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        bucket.put_object(Key='path/f1', Body='content')
+        endpoint = S3Endpoint(base_url='default:bucket/path', includes=[''])
+        client = endpoint.get_bucket().meta.client
+        with patch.object(client, 'get_object', side_effect=AssertionError('GET')):
+            endpoint.update_single_key_data('f1')
+        self.assertEqual(endpoint.key_data, dict(f1=dict(size=7, etag='9a0364b9e99bb480dd25e1f0284c8555')))
+
+    @mock_s3
+    def test_bucket_root(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        bucket.put_object(Key='f1', Body='content')
+        endpoint = S3Endpoint(base_url='default:bucket', includes=[''])
+        endpoint.update_single_key_data('f1')
+        self.assertEqual(endpoint.key_data, dict(f1=dict(size=7, etag='9a0364b9e99bb480dd25e1f0284c8555')))
+
+
+class S3EndpointUpdateKeysDataTest(TestCase):
+    @mock_s3
+    def test_add_change_delete(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        bucket.put_object(Key='path/f1', Body='content')
+        bucket.put_object(Key='path/f2', Body='content')
+        endpoint = S3Endpoint(base_url='default:bucket/path', includes=[''], workers=4)
+        endpoint.update_key_data()
+        self.assertEqual(endpoint.counter.total_files, 2)
+        self.assertEqual(endpoint.counter.total_bytes, 14)
+        # Change f1, delete f2, add f3
+        bucket.put_object(Key='path/f1', Body='contentcontent')
+        bucket.Object('path/f2').delete()
+        bucket.put_object(Key='path/f3', Body='content')
+        endpoint.update_keys_data(['f1', 'f2', 'f3', 'f4'])
+        self.assertEqual(
+            endpoint.key_data,
+            dict(
+                f1=dict(size=14, etag='6858851eee0e05f318897984757b59dc'),
+                f3=dict(size=7, etag='9a0364b9e99bb480dd25e1f0284c8555'),
+            ),
+        )
+        self.assertEqual(
+            endpoint.etag,
+            dict(f1='6858851eee0e05f318897984757b59dc', f3='9a0364b9e99bb480dd25e1f0284c8555'),
+        )
+        self.assertEqual(endpoint.counter.total_files, 2)
+        self.assertEqual(endpoint.counter.total_bytes, 21)
+
 
 class S3EndpointGetPathTest(TestCase):
     def test_1(self):
@@ -330,3 +379,43 @@ class S3EndpointDeleteTest(TestCase):
         endpoint.delete('f1')
         objects = list(bucket.objects.filter(Prefix='path/f1'))
         self.assertEqual(len(objects), 0)
+
+
+class S3EndpointDeleteKeysTest(TestCase):
+    @mock_s3
+    def test_ok(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        for key in ['path/f1', 'path/f2', 'path/d1/f3', 'other/f1']:
+            bucket.put_object(Key=key, Body='content')
+        endpoint = S3Endpoint(base_url='default:bucket/path', includes=[''])
+        errors = endpoint.delete_keys(['f1', 'f2', 'd1/f3'])
+        self.assertEqual(errors, dict())
+        keys = [obj.key for obj in bucket.objects.all()]
+        self.assertEqual(keys, ['other/f1'])
+
+    @mock_s3
+    def test_fake(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        bucket.put_object(Key='path/f1', Body='content')
+        endpoint = S3Endpoint(base_url='default:bucket/path', includes=[''], verbosity=1)
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            errors = endpoint.delete_keys(['f1'], fake=True)
+        self.assertEqual(errors, dict())
+        self.assertIn('INFO <delete> f1', stdout.getvalue())
+        keys = [obj.key for obj in bucket.objects.all()]
+        self.assertEqual(keys, ['path/f1'])
+
+    @mock_s3
+    def test_errors(self):
+        boto3.resource('s3').create_bucket(Bucket='bucket')
+        endpoint = S3Endpoint(base_url='default:bucket/path', includes=[''])
+        client = endpoint.get_bucket().meta.client
+        response = dict(Errors=[dict(Key='path/f2', Code='AccessDenied', Message='Access Denied')])
+        with patch.object(client, 'delete_objects', return_value=response) as delete_objects:
+            errors = endpoint.delete_keys(['f1', 'f2'])
+        self.assertEqual(errors, dict(f2='AccessDenied - Access Denied'))
+        delete_objects.assert_called_once_with(
+            Bucket='bucket',
+            Delete=dict(Objects=[dict(Key='path/f1'), dict(Key='path/f2')], Quiet=True),
+        )
@@ -2,10 +2,13 @@ import io
 import os
 import time
 import boto3
+from contextlib import redirect_stdout
 from queue import Queue
 from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import patch
 from moto import mock_s3
+from ..s3 import S3Endpoint
 from ..sync import SyncManager
 
 
@@ -82,6 +85,124 @@ class SyncManagerTransferTest(TestCase):
             manager.transfer('f1')
 
 
+class SyncManagerExecuteOperationsTest(TestCase):
+    def get_manager(self, source_dir, workers):
+        manager = SyncManager(
+            source=source_dir,
+            destination='default:bucket/workers-{}'.format(workers),
+            includes=[''],
+            cache_file=io.StringIO(),
+            workers=workers,
+        )
+        for name in ['f1', 'f2', 'f3', 'f4', 'f5', 'f6', 'f7', 'f8']:
+            with open(manager.source.get_path(name), 'w') as f:
+                f.write('content')
+        manager.source.update_key_data()
+        manager.destination.update_key_data()
+        return manager
+
+    def slow_upload(self, upload):
+        def wrapper(endpoint, key, source_path):
+            time.sleep(0.1)
+            return upload(endpoint, key, source_path)
+        return wrapper
+
+    def execute(self, workers):
+        with TemporaryDirectory() as source_dir:
+            manager = self.get_manager(source_dir, workers)
+            operations = manager.get_operations()
+            self.assertEqual(len(operations['transfer']), 8)
+            with patch.object(S3Endpoint, 'upload', self.slow_upload(S3Endpoint.upload)):
+                start = time.time()
+                manager.sync_operations(operations)
+                elapsed = time.time() - start
+            self.assertEqual(manager.operations, dict(transfer=[], delete=[]))
+            self.assertEqual(manager.queue_counter.total_files, 0)
+            self.assertEqual(manager.queue_counter.total_bytes, 0)
+            self.assertEqual(manager.transferred_counter.total_files, 8)
+            self.assertEqual(manager.transferred_counter.total_bytes, 56)
+            self.assertEqual(len(manager.destination.key_data), 8)
+        return elapsed
+
+    @mock_s3
+    def test_workers_throughput(self):
+        boto3.resource('s3').create_bucket(Bucket='bucket')
+        serial = self.execute(1)
+        parallel = self.execute(8)
+        self.assertGreaterEqual(serial, 0.8)
+        self.assertLess(parallel, serial / 2)
+
+    @mock_s3
+    def test_source_vanished(self):
+        boto3.resource('s3').create_bucket(Bucket='bucket')
+        with TemporaryDirectory() as source_dir:
+            manager = self.get_manager(source_dir, 4)
+            os.remove(manager.source.get_path('f3'))
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                manager.sync_operations(manager.get_operations())
+            self.assertIn('ERROR <SyncManager>', stdout.getvalue())
+            self.assertIn('f3', manager.operations['transfer'])
+            self.assertNotIn('f3', manager.destination.key_data)
+            transferred = manager.transferred_counter.total_files
+            self.assertEqual(transferred, len(manager.destination.key_data))
+            self.assertEqual(manager.queue_counter.total_files, 8 - transferred)
+
+
+class SyncManagerDeleteOperationsTest(TestCase):
+    def get_manager(self, bucket):
+        for index in range(5):
+            bucket.put_object(Key='path/f{}'.format(index), Body='content')
+        manager = SyncManager(
+            source='/tmp/s3sync-empty-source',
+            destination='default:bucket/path',
+            includes=[''],
+            cache_file=io.StringIO(),
+            workers=2,
+        )
+        manager.destination.delete_batch_size = 2
+        manager.source.update_key_data()
+        manager.destination.update_key_data()
+        return manager
+
+    @mock_s3
+    def test_batches(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        manager = self.get_manager(bucket)
+        client = manager.destination.get_bucket().meta.client
+        with patch.object(client, 'delete_objects', wraps=client.delete_objects) as delete_objects:
+            manager.sync_operations(manager.get_operations())
+        self.assertEqual(delete_objects.call_count, 3)
+        self.assertEqual(list(bucket.objects.all()), [])
+        self.assertEqual(manager.operations, dict(transfer=[], delete=[]))
+        self.assertEqual(manager.transferred_counter.total_files, 5)
+        self.assertEqual(manager.queue_counter.total_files, 0)
+        self.assertEqual(manager.destination.key_data, dict())
+
+    @mock_s3
+    def test_errors(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        manager = self.get_manager(bucket)
+        client = manager.destination.get_bucket().meta.client
+        response = dict(Errors=[dict(Key='path/f3', Code='AccessDenied', Message='Access Denied')])
+        stdout = io.StringIO()
+        with patch.object(client, 'delete_objects', return_value=response), redirect_stdout(stdout):
+            manager.sync_operations(manager.get_operations())
+        self.assertIn('ERROR <delete> f3 - AccessDenied - Access Denied', stdout.getvalue())
+        self.assertEqual(manager.operations, dict(transfer=[], delete=[]))
+        self.assertEqual(manager.transferred_counter.total_files, 4)
+        self.assertEqual(manager.queue_counter.total_files, 0)
+
+    @mock_s3
+    def test_fake(self):
+        bucket = boto3.resource('s3').create_bucket(Bucket='bucket')
+        manager = self.get_manager(bucket)
+        manager.fake = True
+        manager.sync_operations(manager.get_operations())
+        self.assertEqual(len(list(bucket.objects.all())), 5)
+        self.assertEqual(manager.transferred_counter.total_files, 5)
+
+
 class SyncManagerGetEventsOperationsTest(TestCase):
     def setUp(self):
         self.manager = SyncManager(
@@ -1,4 +1,6 @@
+import hashlib
 import os
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 from .. import utils
 
@@ -19,6 +21,31 @@ class GetEtagTest(TestCase):
         etag = utils.get_etag(os.path.join(self.files_path, 'f1'), 2)
         self.assertEqual(etag, '040e6beb623b405da8d66016cfcf75ad-4')
 
+    def test_multipart_uneven(self):
+        etag = utils.get_etag(os.path.join(self.files_path, 'f1'), 3)
+        self.assertEqual(etag, self.get_reference_etag(os.path.join(self.files_path, 'f1'), 3))
+
+    def test_multipart_read_size(self):
+        with TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, 'f1')
+            with open(path, 'wb') as f:
+                f.write(os.urandom(utils.READ_SIZE * 5 + 7))
+            for chunk_size in [utils.READ_SIZE - 1, utils.READ_SIZE * 2 + 3, utils.CHUNK_SIZE]:
+                etag = utils.get_etag(path, chunk_size)
+                self.assertEqual(etag, self.get_reference_etag(path, chunk_size))
+
+    def get_reference_etag(self, filename, chunk_size):
+        md5s = []
+        with open(filename, 'rb') as fp:
+            data = fp.read(chunk_size)
+            while data:
+                md5s.append(hashlib.md5(data))
+                data = fp.read(chunk_size)
+        if len(md5s) == 1:
+            return md5s[0].hexdigest()
+        digests = b''.join(m.digest() for m in md5s)
+        return '{}-{}'.format(hashlib.md5(digests).hexdigest(), len(md5s))
+
 
 class ParseS3UrlTest(TestCase):
     def test_profile_bucket(self):
@@ -1,26 +1,43 @@
 import hashlib
+import os
 import queue
 from operator import itemgetter
 
 CHUNK_SIZE = 8 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+
+
+def read_part(fp, view, chunk_size, md5):
+    # Feeds up to chunk_size bytes to md5 reusing view as read buffer
+    length = 0
+    while length < chunk_size:
+        read = fp.readinto(view[:min(len(view), chunk_size - length)])
+        if not read:
+            break
+        md5.update(view[:read])
+        length += read
+    return length
 
 
 def get_etag(filename, chunk_size=CHUNK_SIZE):
-    md5s = []
-    with open(filename, 'rb') as fp:
+    digests = hashlib.md5()
+    parts = 0
+    with open(filename, 'rb', buffering=0) as fp:
+        size = os.fstat(fp.fileno()).st_size
+        view = memoryview(bytearray(max(min(chunk_size, size, READ_SIZE), 1)))
         while True:
-            data = fp.read(chunk_size)
-            if not data:
+            md5 = hashlib.md5()
+            if not read_part(fp, view, chunk_size, md5):
                 break
-            md5s.append(hashlib.md5(data))
-    if len(md5s) == 0:
-        return hashlib.md5(b"").hexdigest()
-    if len(md5s) == 1:
-        return md5s[0].hexdigest()
-
-    digests = b"".join(m.digest() for m in md5s)
-    md5_hash = hashlib.md5(digests)
-    return '{}-{}'.format(md5_hash.hexdigest(), len(md5s))
+            if parts == 0:
+                first_md5 = md5
+            digests.update(md5.digest())
+            parts += 1
+    if parts == 0:
+        return md5.hexdigest()
+    if parts == 1:
+        return first_md5.hexdigest()
+    return '{}-{}'.format(digests.hexdigest(), parts)
 
 
 def parse_s3_url(url):